@@ -0,0 +1,365 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from fls_engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Append-only audit trail of triage decisions.
+#
+# Each scored patient becomes one fixed-width little-endian record (see
+# record_dtype) holding the case2-style input interval, the urgency
+# interval and its midpoint, the band and the model version, followed by
+# a CRC32 of the record.  Records go to numbered segment files behind a
+# small header, so a segment is directly readable with np.memmap.
+#
+# Writes use group commit: appends land in an in-memory batch that is
+# written and fsync'd once it holds ``batch_records`` records or its
+# oldest record is ``max_delay`` seconds old, so durability costs one
+# fsync per batch instead of one per patient.  On open, a torn tail left
+# by a crash (a partial record, and any run of records with bad CRCs at
+# the very end) is truncated away before appending resumes.  A bad record
+# followed by good ones is not a torn write; it is kept, so no committed
+# record is lost, and reported in ``corrupt_records`` and by verify().
+# New segments get their header in a temporary file that is then renamed
+# into place, so a segment never exists without one; a newest segment
+# shorter than the header (left by older writers) is still treated as a
+# torn rollover and recreated.
+
+MAGIC = b"FLSAUDIT"
+FORMAT_VERSION = 1
+HEADER = np.dtype([
+    ("magic", "S8"), ("format", "<u4"), ("n_inputs", "<u4"), ("record_size", "<u4"), ("reserved", "V44"),
+])
+SEGMENT_PATTERN = "segment-{:08d}.audit"
+
+
+def record_dtype(n_inputs=3):
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("patient_id", "S16"),
+        ("inputs_low", "<f8", (n_inputs,)),
+        ("inputs_high", "<f8", (n_inputs,)),
+        ("urgency_low", "<f8"),
+        ("urgency_high", "<f8"),
+        ("urgency", "<f8"),
+        ("band", "i1"),
+        ("model_version", "S39"),
+        ("crc", "<u4"),
+    ])
+
+
+def _crcs(records):
+    # Each record's CRC covers every byte before its own crc field.
+    raw = memoryview(np.ascontiguousarray(records).view(np.uint8))
+    size = records.dtype.itemsize
+    return np.fromiter((zlib.crc32(raw[i:i + size - 4]) for i in range(0, len(raw), size)),
+                       dtype="<u4", count=len(records))
+
+
+def _is_torn_segment(path):
+    return os.path.getsize(path) < HEADER.itemsize
+
+
+def _segments(directory):
+    names = sorted(n for n in os.listdir(directory) if n.startswith("segment-") and n.endswith(".audit"))
+    return [os.path.join(directory, n) for n in names]
+
+
+def _read_header(f):
+    header = np.frombuffer(f.read(HEADER.itemsize), dtype=HEADER)
+    if len(header) != 1 or header["magic"][0] != MAGIC or header["format"][0] != FORMAT_VERSION:
+        raise ValueError(f"{f.name} is not an audit segment")
+    return int(header["n_inputs"][0]), int(header["record_size"][0])
+
+
+class AuditLog:
+
+    def __init__(self, directory, n_inputs=3, batch_records=4096, max_delay=0.05,
+                 segment_bytes=64 << 20, durable=True):
+        self.directory = directory
+        self.dtype = record_dtype(n_inputs)
+        self.n_inputs = n_inputs
+        self.batch_records = batch_records
+        self.max_delay = max_delay
+        self.segment_records = max((segment_bytes - HEADER.itemsize) // self.dtype.itemsize, 1)
+        self.durable = durable
+        self.committed = 0
+        self.recovered_bytes = 0
+        self.corrupt_records = np.zeros(0, dtype=np.intp)
+
+        self._lock = threading.Lock()
+        self._batch = np.zeros(batch_records, dtype=self.dtype)
+        self._pending = 0
+        self._oldest = None
+        os.makedirs(directory, exist_ok=True)
+        self._open_tail()
+
+        self._stop = threading.Event()
+        self._flusher = None
+        if max_delay is not None:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="audit-flusher", daemon=True)
+            self._flusher.start()
+
+    # ------------------ Segments and recovery ------------------
+
+    def _open_tail(self):
+        segments = _segments(self.directory)
+        if not segments:
+            self._new_segment(0)
+            return
+        path = segments[-1]
+        self._segment_index = int(os.path.basename(path)[8:16])
+        if _is_torn_segment(path):
+            # A crash during rollover; nothing was ever committed to it.
+            self.recovered_bytes += os.path.getsize(path)
+            logger.warning("Recreating %s, which has no complete header", path)
+            self._new_segment(self._segment_index)
+            return
+        self._file = open(path, "r+b")
+        n_inputs, record_size = _read_header(self._file)
+        if n_inputs != self.n_inputs or record_size != self.dtype.itemsize:
+            raise ValueError(f"{path} holds records for {n_inputs} inputs, not {self.n_inputs}")
+        self._segment_count = self._recover(path)
+
+    def _recover(self, path):
+        # Keep whole records up to the last one whose CRC checks out; bad
+        # records before that are reported, not dropped.
+        size = os.path.getsize(path)
+        count = (size - HEADER.itemsize) // self.dtype.itemsize
+        records = np.fromfile(path, dtype=self.dtype, count=count, offset=HEADER.itemsize)
+        good = _crcs(records) == records["crc"]
+        valid = np.flatnonzero(good)
+        keep = int(valid[-1]) + 1 if len(valid) else 0
+        self.corrupt_records = np.flatnonzero(~good[:keep])
+        if len(self.corrupt_records):
+            logger.warning("%s has %d corrupt records before its last valid one (first at index %d)",
+                           path, len(self.corrupt_records), self.corrupt_records[0])
+        end = HEADER.itemsize + keep * self.dtype.itemsize
+        if end != size:
+            self.recovered_bytes += size - end
+            self._file.truncate(end)
+            self._sync(self._file)
+        self._file.seek(end)
+        return keep
+
+    def _new_segment(self, index):
+        self._segment_index = index
+        path = os.path.join(self.directory, SEGMENT_PATTERN.format(index))
+        header = np.zeros(1, dtype=HEADER)
+        header["magic"], header["format"] = MAGIC, FORMAT_VERSION
+        header["n_inputs"], header["record_size"] = self.n_inputs, self.dtype.itemsize
+        staging = path + ".tmp"
+        with open(staging, "wb") as f:
+            f.write(header.tobytes())
+            self._sync(f)
+        os.replace(staging, path)
+        self._sync_directory()
+        self._file = open(path, "r+b")
+        self._file.seek(0, os.SEEK_END)
+        self._segment_count = 0
+
+    def _sync(self, f):
+        f.flush()
+        if self.durable:
+            os.fsync(f.fileno())
+
+    def _sync_directory(self):
+        if self.durable and hasattr(os, "O_DIRECTORY"):
+            fd = os.open(self.directory, os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    # ------------------ Appending ------------------
+
+    def append(self, patient_id, inputs_low, inputs_high, urgency_low, urgency_high, band, model_version,
+               timestamp=None):
+        self.append_batch([patient_id], [inputs_low], [inputs_high], [urgency_low], [urgency_high], [band],
+                          model_version, None if timestamp is None else [timestamp])
+
+    def append_batch(self, patient_ids, inputs_low, inputs_high, urgency_low, urgency_high, bands, model_version,
+                     timestamps=None):
+        ids = [str(p).encode("utf-8") for p in patient_ids]
+        version = model_version.encode("utf-8")
+        if max(map(len, ids), default=0) > 16 or len(version) > 39:
+            raise ValueError("Patient IDs are limited to 16 UTF-8 bytes and model versions to 39")
+        n = len(ids)
+        records = np.zeros(n, dtype=self.dtype)
+        records["timestamp"] = time.time() if timestamps is None else timestamps
+        records["patient_id"] = ids
+        records["inputs_low"] = inputs_low
+        records["inputs_high"] = inputs_high
+        records["urgency_low"] = urgency_low
+        records["urgency_high"] = urgency_high
+        records["urgency"] = (records["urgency_low"] + records["urgency_high"]) / 2
+        records["band"] = bands
+        records["model_version"] = version
+
+        with self._lock:
+            start = 0
+            while start < n:
+                take = min(n - start, self.batch_records - self._pending)
+                self._batch[self._pending:self._pending + take] = records[start:start + take]
+                if self._pending == 0:
+                    self._oldest = time.monotonic()
+                self._pending += take
+                start += take
+                if self._pending == self.batch_records:
+                    self._commit()
+            if self._pending and self.max_delay is not None and time.monotonic() - self._oldest >= self.max_delay:
+                self._commit()
+
+    def _commit(self):
+        # Caller holds the lock.  Writes the pending batch and fsyncs once,
+        # rolling over to a new segment when the current one is full.
+        batch = self._batch[:self._pending]
+        batch["crc"] = _crcs(batch)
+        written = 0
+        while written < len(batch):
+            room = self.segment_records - self._segment_count
+            if room == 0:
+                self._sync(self._file)
+                self._file.close()
+                self._new_segment(self._segment_index + 1)
+                continue
+            chunk = batch[written:written + room]
+            self._file.write(chunk.tobytes())
+            self._segment_count += len(chunk)
+            written += len(chunk)
+        self._sync(self._file)
+        self.committed += len(batch)
+        self._pending = 0
+        self._oldest = None
+
+    def flush(self):
+        """Make every record appended so far durable."""
+        with self._lock:
+            if self._pending:
+                self._commit()
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.max_delay):
+            with self._lock:
+                if self._pending and time.monotonic() - self._oldest >= self.max_delay:
+                    self._commit()
+
+    def close(self):
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ------------------ Replay ------------------
+
+class AuditReader:
+    """Memory-mapped, read-only view of an audit directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.segments = []
+        paths = _segments(directory)
+        if paths and _is_torn_segment(paths[-1]):
+            # Torn rollover: the newest segment never got its header.
+            paths = paths[:-1]
+        for path in paths:
+            with open(path, "rb") as f:
+                n_inputs, record_size = _read_header(f)
+            dtype = record_dtype(n_inputs)
+            if dtype.itemsize != record_size:
+                raise ValueError(f"{path} has an unknown record layout")
+            count = (os.path.getsize(path) - HEADER.itemsize) // record_size
+            if count:
+                self.segments.append(np.memmap(path, dtype=dtype, mode="r", offset=HEADER.itemsize, shape=(count,)))
+
+    def __len__(self):
+        return sum(len(s) for s in self.segments)
+
+    def __iter__(self):
+        return iter(self.segments)
+
+    def records(self):
+        return np.concatenate(self.segments) if self.segments else np.zeros(0, dtype=record_dtype())
+
+    def verify(self):
+        """Indices (into records()) of records whose CRC does not match."""
+        bad, offset = [], 0
+        for segment in self.segments:
+            bad.append(offset + np.flatnonzero(_crcs(segment) != segment["crc"]))
+            offset += len(segment)
+        return np.concatenate(bad) if bad else np.zeros(0, dtype=np.intp)
+
+    def rescore(self, engine):
+        """Re-score every record with ``engine``; returns (urgency, records) for comparison."""
+        scores = []
+        for segment in self.segments:
+            low, high = engine.evaluate_interval(segment["inputs_low"], segment["inputs_high"])
+            scores.append((low + high) / 2)
+        return (np.concatenate(scores) if scores else np.zeros(0)), self.records()
+
+
+def main(n_patients=100_000, batch=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    engine = Engine.from_file()
+    centre = rng.uniform(engine.domains[:, 0], engine.domains[:, 1], size=(n_patients, len(engine.input_names)))
+    spread = np.array([0.0, 1.0, 0.3])
+    lows = np.clip(centre - spread, engine.domains[:, 0], engine.domains[:, 1])
+    highs = np.clip(centre + spread, engine.domains[:, 0], engine.domains[:, 1])
+    ids = [f"P{i:07d}" for i in range(n_patients)]
+
+    def score(start):
+        low, high = engine.evaluate_interval(lows[start:start + batch], highs[start:start + batch])
+        return low, high, engine.band_index((low + high) / 2)
+
+    t0 = time.perf_counter()
+    for start in range(0, n_patients, batch):
+        score(start)
+    t_plain = time.perf_counter() - t0
+
+    with tempfile.TemporaryDirectory() as directory:
+        with AuditLog(directory, n_inputs=len(engine.input_names)) as log:
+            t0 = time.perf_counter()
+            for start in range(0, n_patients, batch):
+                low, high, bands = score(start)
+                log.append_batch(ids[start:start + batch], lows[start:start + batch], highs[start:start + batch],
+                                 low, high, bands, engine.version)
+            log.flush()
+            t_audited = time.perf_counter() - t0
+
+        reader = AuditReader(directory)
+        t0 = time.perf_counter()
+        rescored, records = reader.rescore(engine)
+        t_replay = time.perf_counter() - t0
+        size = sum(os.path.getsize(p) for p in _segments(directory))
+
+        print(f"{n_patients} patients in batches of {batch}: scoring {1e3 * t_plain:.0f} ms, "
+              f"scoring + audit {1e3 * t_audited:.0f} ms ({t_audited / t_plain:.2f}x)")
+        print(f"{len(reader)} records, {size / 1e6:.1f} MB, {len(reader.verify())} bad CRCs; "
+              f"replay + re-score {1e3 * t_replay:.0f} ms, max drift {np.abs(rescored - records['urgency']).max():.2e}")
+
+        # Simulate a crash mid-write: a torn record at the tail is dropped on reopen.
+        path = _segments(directory)[-1]
+        with open(path, "ab") as f:
+            f.write(b"\x01" * (reader.segments[-1].dtype.itemsize // 2))
+        del reader, records
+        with AuditLog(directory, n_inputs=len(engine.input_names)) as log:
+            print(f"Reopened after a torn write: {log.recovered_bytes} bytes of tail discarded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import bisect
+import itertools
+import time
+
+import numpy as np
+
+from fls_engine import Engine
+
+# Band-only classification from a precomputed decision-region index.
+#
+# Between consecutive MF support endpoints the set of non-zero memberships
+# is fixed on every input, so the input box splits into cells in which the
+# same rules fire.  When every rule firing in a cell shares one consequent,
+# the output is that consequent clipped at some alpha in (0, 1], and its
+# centroid's band can be checked for all alpha once, up front.  Such cells
+# get a constant band; classify() answers them with one bisect per input
+# and falls back to full evaluation everywhere else.
+
+
+class RegionIndex:
+
+    def __init__(self, engine=None, alpha_steps=2001):
+        self.engine = engine if engine is not None else Engine.from_file()
+        if not self.engine.band_names:
+            raise ValueError("Model defines no bands to classify into")
+        self.breakpoints = []
+        for i, sets in enumerate(self.engine.input_sets):
+            low, high = self.engine.domains[i]
+            points = np.concatenate([[low, high], sets.a, sets.d])
+            self.breakpoints.append(sorted(set(np.clip(points, low, high).tolist())))
+        self._breakpoint_arrays = [np.array(bp) for bp in self.breakpoints]
+        self._consequent_bands = self._single_consequent_bands(alpha_steps)
+        self.table = self._build_table()
+        self.shortcut_hits = 0
+        self.fallbacks = 0
+
+    def _single_consequent_bands(self, alpha_steps):
+        # Band of the centroid of each consequent clipped at any alpha in
+        # (0, 1], or -1 if the band changes with alpha.
+        n_out = len(self.engine.output_sets)
+        alphas = np.linspace(0.0, 1.0, alpha_steps)[1:]
+        bands = []
+        for c in range(n_out):
+            strengths = np.zeros((len(alphas), n_out))
+            strengths[:, c] = alphas
+            found = np.unique(self.engine.band_index(self.engine.defuzzify(strengths)))
+            bands.append(int(found[0]) if len(found) == 1 else -1)
+        return bands
+
+    def _build_table(self):
+        engine = self.engine
+        active_per_input = []
+        for i, sets in enumerate(engine.input_sets):
+            bp = self.breakpoints[i]
+            mids = (np.array(bp[:-1]) + np.array(bp[1:])) / 2
+            active = (mids[:, None] > sets.a) & (mids[:, None] < sets.d)
+            active_per_input.append(engine.expand_terms(i, active))
+
+        shape = tuple(len(bp) - 1 for bp in self.breakpoints)
+        table = np.full(shape, -1, dtype=np.int8)
+        for cell in itertools.product(*(range(n) for n in shape)):
+            fires = np.ones(len(engine.rules), dtype=bool)
+            for i, k in enumerate(cell):
+                fires &= active_per_input[i][k][engine.antecedents[:, i]]
+            consequents = np.unique(engine.consequents[fires])
+            if len(consequents) == 1:
+                table[cell] = self._consequent_bands[consequents[0]]
+        return table
+
+    def decided_volume(self):
+        """Fraction of the input box whose band is answered from the index."""
+        widths = [np.diff(bp) / (bp[-1] - bp[0]) for bp in self.breakpoints]
+        volume = widths[0]
+        for w in widths[1:]:
+            volume = np.multiply.outer(volume, w)
+        return float(volume[self.table >= 0].sum())
+
+    @property
+    def shortcut_fraction(self):
+        total = self.shortcut_hits + self.fallbacks
+        return self.shortcut_hits / total if total else 0.0
+
+    def reset_stats(self):
+        self.shortcut_hits = 0
+        self.fallbacks = 0
+
+    # ------------------ Classification ------------------
+
+    def classify(self, *values):
+        if len(values) != len(self.breakpoints):
+            names = self.engine.input_names
+            raise ValueError(f"Expected inputs with {len(names)} columns {names}")
+        cell = []
+        for x, bp in zip(values, self.breakpoints):
+            k = bisect.bisect_left(bp, x)
+            # On a breakpoint (or outside the domain) defer to the engine.
+            if k == 0 or k == len(bp) or bp[k] == x:
+                cell = None
+                break
+            cell.append(k - 1)
+        band = self.table[tuple(cell)] if cell is not None else -1
+        if band >= 0:
+            self.shortcut_hits += 1
+        else:
+            self.fallbacks += 1
+            band = self.engine.band_index(self.engine.evaluate(*values))
+        return self.engine.band_name(band)
+
+    def classify_batch(self, X):
+        """Band names for each row of ``X``, as classify() returns them."""
+        return [self.engine.band_name(i) for i in self.classify_batch_indices(X).tolist()]
+
+    def classify_batch_indices(self, X):
+        """Band indices (into ``engine.band_names``, -1 for no band) for each row of ``X``."""
+        X = self.engine.as_batch(X)
+        cells = []
+        decidable = np.ones(len(X), dtype=bool)
+        for i, bp in enumerate(self._breakpoint_arrays):
+            k = np.searchsorted(bp, X[:, i], side="left")
+            decidable &= (k > 0) & (k < len(bp))
+            k = np.clip(k, 1, len(bp) - 1)
+            decidable &= bp[k] != X[:, i]
+            cells.append(k - 1)
+        bands = np.where(decidable, self.table[tuple(cells)], -1).astype(np.intp)
+        rest = bands < 0
+        if rest.any():
+            bands[rest] = self.engine.band_index(self.engine.evaluate_batch(X[rest]))
+        self.fallbacks += int(rest.sum())
+        self.shortcut_hits += len(X) - int(rest.sum())
+        return bands
+
+
+def main(n_patients=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    index = RegionIndex()
+    engine = index.engine
+    X = rng.uniform(engine.domains[:, 0], engine.domains[:, 1], size=(n_patients, len(engine.input_names)))
+
+    print(f"Decided cells cover {100 * index.decided_volume():.1f}% of the input box")
+
+    t0 = time.perf_counter()
+    bands = index.classify_batch_indices(X)
+    t_index = time.perf_counter() - t0
+    print(f"Shortcut taken by {100 * index.shortcut_fraction:.1f}% of {n_patients} uniform patients")
+
+    t0 = time.perf_counter()
+    reference = engine.band_index(engine.evaluate_batch(X))
+    t_full = time.perf_counter() - t0
+    print(f"classify_batch_indices: {1e3 * t_index:.1f} ms, full evaluation: {1e3 * t_full:.1f} ms, "
+          f"{int((bands != reference).sum())} disagreements")
+
+    index.reset_stats()
+    rows = X[:10_000].tolist()
+    t0 = time.perf_counter()
+    for row in rows:
+        index.classify(*row)
+    t_single = time.perf_counter() - t0
+    print(f"classify: {1e6 * t_single / len(rows):.1f} us/patient "
+          f"({100 * index.shortcut_fraction:.1f}% shortcut)")
+
+
+if __name__ == "__main__":
+    main()
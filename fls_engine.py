@@ -0,0 +1,526 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Vectorised Type-1 fuzzy engine for the case1 triage model.
+#
+# Mirrors what juzzyPython's T1_Rulebase.evaluate(1) does for case1.py:
+# minimum t-norm over antecedents, minimum implication, maximum aggregation
+# and centroid defuzzification, where the centroid is discretised over the
+# support of the consequents that actually fired.  The rulebase and MF
+# parameters come from an external JSON definition (see case1_rulebase.json)
+# instead of being hard-coded, so the model can change without a restart.
+
+# Next to this module, so the scripts run from any working directory.
+DEFAULT_DEFINITION = os.path.join(os.path.dirname(os.path.abspath(__file__)), "case1_rulebase.json")
+# In a rule antecedent, "don't care": any set of that input.
+WILDCARD = "*"
+
+
+class DefinitionError(ValueError):
+    pass
+
+
+# ------------------ Membership Functions ------------------
+
+def _trapezoid_params(name, params):
+    # [a, b, c] is a triangle (T1MF_Triangular), [a, b, c, d] a trapezoid
+    # (T1MF_Trapezoidal); both are stored as a trapezoid.
+    if not isinstance(params, (list, tuple)) or len(params) not in (3, 4):
+        raise DefinitionError(f"Set '{name}' needs 3 (triangle) or 4 (trapezoid) points")
+    try:
+        points = [float(p) for p in params]
+    except (TypeError, ValueError):
+        raise DefinitionError(f"Set '{name}' has non-numeric points: {params}")
+    if not np.isfinite(points).all():
+        raise DefinitionError(f"Set '{name}' points must be finite: {params}")
+    if len(points) == 3:
+        points = [points[0], points[1], points[1], points[2]]
+    if any(b < a for a, b in zip(points, points[1:])):
+        raise DefinitionError(f"Set '{name}' points must be non-decreasing: {params}")
+    return points
+
+
+class PiecewiseLinearSets:
+    """A family of trapezoidal MFs evaluated together on a vector of inputs."""
+
+    def __init__(self, names, points):
+        self.names = list(names)
+        p = np.asarray(points, dtype=float).reshape(-1, 4)
+        self.a, self.b, self.c, self.d = p.T
+        # Knots for np.interp.  The duplicate point of a shoulder (a == b or
+        # c == d) or triangle peak is dropped, so a shoulder is flat at 1 up
+        # to and including its edge, as in juzzy.
+        self._knots = []
+        for a, b, c, d in p:
+            knots = [(a, 0.0)] if b > a else []
+            knots += [(b, 1.0)] + ([(c, 1.0)] if c > b else [])
+            knots += [(d, 0.0)] if d > c else []
+            xp, fp = zip(*knots)
+            self._knots.append((np.array(xp), np.array(fp)))
+
+    def __len__(self):
+        return len(self.names)
+
+    def points(self):
+        return np.stack([self.a, self.b, self.c, self.d], axis=1)
+
+    def membership(self, x):
+        # x has shape (N,) -> (N, n_sets)
+        x = np.asarray(x, dtype=float).reshape(-1)
+        out = np.empty((len(x), len(self.names)))
+        for j, (xp, fp) in enumerate(self._knots):
+            out[:, j] = np.interp(x, xp, fp, left=0.0, right=0.0)
+        return out
+
+    def slope(self, x):
+        # d membership / dx, (N,) -> (N, n_sets); right derivative at knots.
+        x = np.asarray(x, dtype=float).reshape(-1)
+        out = np.zeros((len(x), len(self.names)))
+        for j, (xp, fp) in enumerate(self._knots):
+            if len(xp) < 2:
+                continue
+            slopes = np.diff(fp) / np.diff(xp)
+            segment = np.searchsorted(xp, x, side="right") - 1
+            inside = (segment >= 0) & (segment < len(slopes))
+            out[inside, j] = slopes[segment[inside]]
+        return out
+
+
+# ------------------ Definition ------------------
+
+def load_definition(path=DEFAULT_DEFINITION):
+    with open(path, "rb") as f:
+        raw = f.read()
+    return parse_definition(raw)
+
+
+def parse_definition(raw):
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    try:
+        definition = json.loads(raw)
+    except ValueError as e:
+        raise DefinitionError(f"Rulebase definition is not valid JSON: {e}")
+    validate_definition(definition)
+    return stamp_version(definition)
+
+
+def stamp_version(definition):
+    # The model version is the definition's own label plus a content hash,
+    # so two different rulebases can never report the same version.
+    content = {k: v for k, v in definition.items() if k != "_version"}
+    digest = hashlib.sha256(
+        json.dumps(content, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()[:12]
+    label = definition.get("version")
+    definition["_version"] = f"{label}+{digest}" if label else digest
+    return definition
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_domain(owner, domain):
+    if not isinstance(domain, (list, tuple)) or len(domain) != 2 or not all(map(_is_number, domain)):
+        raise DefinitionError(f"{owner} domain must be [low, high]")
+    if not np.isfinite(domain).all():
+        raise DefinitionError(f"{owner} domain must be finite, got {domain}")
+    low, high = float(domain[0]), float(domain[1])
+    if not low < high:
+        raise DefinitionError(f"{owner} domain must satisfy low < high, got {domain}")
+
+
+def _check_sets(owner, sets):
+    if not isinstance(sets, dict) or not sets:
+        raise DefinitionError(f"{owner} needs at least one fuzzy set")
+    for name, params in sets.items():
+        if not isinstance(name, str) or not name:
+            raise DefinitionError(f"{owner} has a set without a name")
+        _trapezoid_params(name, params)
+
+
+def validate_definition(definition):
+    if not isinstance(definition, dict):
+        raise DefinitionError("Rulebase definition must be a JSON object")
+
+    inputs = definition.get("inputs")
+    if not isinstance(inputs, list) or not inputs:
+        raise DefinitionError("Rulebase definition needs a non-empty 'inputs' list")
+    set_owner = {}
+    seen = set()
+    for inp in inputs:
+        name = inp.get("name") if isinstance(inp, dict) else None
+        if not isinstance(name, str) or not name:
+            raise DefinitionError("Every input needs a 'name'")
+        if name in seen:
+            raise DefinitionError(f"Duplicate input '{name}'")
+        seen.add(name)
+        _check_domain(f"Input '{name}'", inp.get("domain"))
+        _check_sets(f"Input '{name}'", inp.get("sets"))
+        for set_name in inp["sets"]:
+            if set_name in set_owner:
+                raise DefinitionError(f"Set name '{set_name}' is used by more than one input")
+            set_owner[set_name] = name
+
+    output = definition.get("output")
+    if not isinstance(output, dict) or not isinstance(output.get("name"), str) or not output["name"]:
+        raise DefinitionError("Rulebase definition needs an 'output' with a 'name'")
+    _check_domain("Output", output.get("domain"))
+    _check_sets("Output", output.get("sets"))
+    discretisation = output.get("discretisation", 100)
+    if not isinstance(discretisation, int) or isinstance(discretisation, bool) or discretisation < 2:
+        raise DefinitionError("Output discretisation must be an integer of at least 2")
+
+    bands = definition.get("bands", [])
+    if not isinstance(bands, list) or any(
+        not isinstance(b, (list, tuple)) or len(b) != 2 or not isinstance(b[0], str) or not _is_number(b[1])
+        for b in bands
+    ):
+        raise DefinitionError("'bands' must be a list of [name, lower bound] pairs")
+    lowers = [float(b[1]) for b in bands]
+    if any(b <= a for a, b in zip(lowers, lowers[1:])):
+        raise DefinitionError("Band lower bounds must be strictly increasing")
+
+    rules = definition.get("rules")
+    if not isinstance(rules, list) or not rules:
+        raise DefinitionError("Rulebase definition needs a non-empty 'rules' list")
+    input_names = [inp["name"] for inp in inputs]
+    for i, rule in enumerate(rules):
+        antecedents = rule.get("if") if isinstance(rule, dict) else None
+        if not isinstance(antecedents, dict):
+            raise DefinitionError(f"Rule {i} needs an 'if' mapping")
+        if any(not isinstance(k, str) for k in antecedents) or sorted(antecedents) != sorted(input_names):
+            raise DefinitionError(f"Rule {i} must name a set for each of {input_names}")
+        for input_name, set_names in antecedents.items():
+            # A list of sets is their disjunction (max of memberships).
+            if set_names == WILDCARD:
+                continue
+            if isinstance(set_names, str):
+                set_names = [set_names]
+            if not isinstance(set_names, list) or not set_names or not all(isinstance(n, str) for n in set_names):
+                raise DefinitionError(f"Rule {i}: '{input_name}' needs a set name or a non-empty list of them")
+            for set_name in set_names:
+                if set_owner.get(set_name) != input_name:
+                    raise DefinitionError(f"Rule {i}: '{set_name}' is not a set of input '{input_name}'")
+        if not isinstance(rule.get("then"), str) or rule["then"] not in output["sets"]:
+            raise DefinitionError(f"Rule {i}: unknown consequent '{rule.get('then')}'")
+
+
+# ------------------ Engine ------------------
+
+class Engine:
+    """Compiled, immutable evaluator for one rulebase definition."""
+
+    def __init__(self, definition):
+        if "_version" not in definition:
+            validate_definition(definition)
+        self.definition = definition
+        self.version = definition.get("_version", definition.get("version", ""))
+
+        inputs = definition["inputs"]
+        self.input_names = [inp["name"] for inp in inputs]
+        self.domains = np.array([[float(v) for v in inp["domain"]] for inp in inputs])
+        self.input_sets = [
+            PiecewiseLinearSets(inp["sets"], [_trapezoid_params(n, p) for n, p in inp["sets"].items()])
+            for inp in inputs
+        ]
+
+        output = definition["output"]
+        self.output_name = output["name"]
+        self.output_sets = PiecewiseLinearSets(
+            output["sets"], [_trapezoid_params(n, p) for n, p in output["sets"].items()]
+        )
+        self.discretisation = int(output.get("discretisation", 100))
+
+        bands = definition.get("bands", [])
+        self.band_names = [b[0] for b in bands]
+        self.band_lowers = np.array([float(b[1]) for b in bands])
+
+        # Antecedents index per-input "terms": term j < n_sets is set j, and
+        # each distinct disjunction used by a rule gets an extra term after them.
+        self.rules = definition["rules"]
+        self.terms = [[(j,) for j in range(len(s))] for s in self.input_sets]
+        set_index = [{n: j for j, n in enumerate(s.names)} for s in self.input_sets]
+        antecedents = []
+        for rule in self.rules:
+            row = []
+            for i, name in enumerate(self.input_names):
+                set_names = rule["if"][name]
+                if set_names == WILDCARD:
+                    set_names = self.input_sets[i].names
+                elif isinstance(set_names, str):
+                    set_names = [set_names]
+                term = tuple(sorted({set_index[i][n] for n in set_names}))
+                if term not in self.terms[i]:
+                    self.terms[i].append(term)
+                row.append(self.terms[i].index(term))
+            antecedents.append(row)
+        self.antecedents = np.array(antecedents, dtype=np.intp).reshape(len(self.rules), len(self.input_names))
+        out_index = {n: j for j, n in enumerate(self.output_sets.names)}
+        self.consequents = np.array([out_index[rule["then"]] for rule in self.rules], dtype=np.intp)
+        self.rules_by_consequent = [np.flatnonzero(self.consequents == c) for c in range(len(self.output_sets))]
+        self._build_grids()
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_DEFINITION):
+        return cls(load_definition(path))
+
+    def with_rules(self, rules, label):
+        """A new engine with the same sets and bands but a different rulebase."""
+        definition = {k: v for k, v in self.definition.items() if k != "_version"}
+        definition["rules"] = rules
+        definition["version"] = f"{self.definition.get('version') or self.version}-{label}"
+        validate_definition(definition)
+        return Engine(stamp_version(definition))
+
+    def _build_grids(self):
+        # The discretised centroid depends only on which consequents fired
+        # (their supports span the grid), so every grid and the consequent
+        # MFs sampled on it are precomputed per fired-consequent bitmask.
+        #
+        # Grid points covered by one fired consequent alone contribute
+        # min(alpha, m) for that consequent, and the sums of those terms
+        # (plain and x-weighted) are piecewise linear in alpha with knots at
+        # the m values.  They are tabulated for np.interp with mask ``k``'s
+        # table shifted to [2k, 2k + 1], so one call serves every row.
+        # Points where fired consequents overlap are clipped directly.
+        n_out = len(self.output_sets)
+        n_masks = 1 << n_out
+        steps = np.arange(self.discretisation) / (self.discretisation - 1)
+        self._mask_weights = 1 << np.arange(n_out)
+        self._grid_x = np.full((n_masks, self.discretisation), np.nan)
+        self._grid_mf = np.zeros((n_masks, n_out, self.discretisation))
+        solo = [[] for _ in range(n_out)]
+        shared = []
+        for mask in range(n_masks):
+            fired = (mask & self._mask_weights) > 0
+            if mask:
+                left = self.output_sets.a[fired].min()
+                right = self.output_sets.d[fired].max()
+                self._grid_x[mask] = left + (right - left) * steps
+                self._grid_mf[mask] = self.output_sets.membership(self._grid_x[mask]).T
+            x, mf = np.nan_to_num(self._grid_x[mask]), self._grid_mf[mask] * fired[:, None]
+            covered = (mf > 0).sum(axis=0)
+            for c in range(n_out):
+                points = (mf[c] > 0) & (covered == 1)
+                knots = np.unique(np.concatenate([[0.0, 1.0], mf[c, points]]))
+                clipped = np.minimum(knots[:, None], mf[c, points])
+                solo[c].append((2 * mask + knots, clipped @ x[points], clipped.sum(axis=1)))
+            shared.append(np.flatnonzero(covered > 1))
+
+        # Both sums share knots, so they are interpolated together as the
+        # real and imaginary parts of one complex table.
+        self._solo = []
+        for tables in solo:
+            knots, weighted, plain = (np.concatenate(parts) for parts in zip(*tables))
+            self._solo.append((knots, weighted + 1j * plain))
+        width = max(len(points) for points in shared)
+        self._has_shared = np.array([len(points) > 0 for points in shared])
+        self._shared_x = np.zeros((n_masks, width))
+        self._shared_mf = [np.zeros((n_masks, width)) for _ in range(n_out)]
+        for mask, points in enumerate(shared):
+            self._shared_x[mask, :len(points)] = self._grid_x[mask, points]
+            for c in range(n_out):
+                self._shared_mf[c][mask, :len(points)] = self._grid_mf[mask, c, points]
+
+    # ------------------ Evaluation ------------------
+
+    def as_batch(self, X):
+        """``X`` as a float (N, n_inputs) array; raises ValueError outside the input domains."""
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.ndim != 2 or X.shape[1] != len(self.input_names):
+            raise ValueError(f"Expected inputs with {len(self.input_names)} columns {self.input_names}")
+        # Written so that NaN counts as outside.
+        outside = ~((X >= self.domains[:, 0]) & (X <= self.domains[:, 1]))
+        if outside.any():
+            row, col = np.argwhere(outside)[0]
+            low, high = self.domains[col]
+            raise ValueError(
+                f"{self.input_names[col]}={X[row, col]} is outside its domain [{low:g}, {high:g}]"
+            )
+        return X
+
+    def memberships(self, X):
+        X = self.as_batch(X)
+        return [sets.membership(X[:, i]) for i, sets in enumerate(self.input_sets)]
+
+    def expand_terms(self, i, per_set):
+        """Map per-set values (..., n_sets) of input ``i`` to its terms (..., n_terms)."""
+        extra = self.terms[i][len(self.input_sets[i]):]
+        if not extra:
+            return per_set
+        ors = [per_set[..., list(term)].max(axis=-1) for term in extra]
+        return np.concatenate([per_set, np.stack(ors, axis=-1)], axis=-1)
+
+    def rule_strengths(self, X, memberships=None):
+        mus = self.memberships(X) if memberships is None else memberships
+        mus = [self.expand_terms(i, mu) for i, mu in enumerate(mus)]
+        strengths = mus[0][:, self.antecedents[:, 0]]
+        for i in range(1, len(mus)):
+            np.minimum(strengths, mus[i][:, self.antecedents[:, i]], out=strengths)
+        return strengths
+
+    def consequent_strengths(self, X, rule_strengths=None):
+        strengths = self.rule_strengths(X) if rule_strengths is None else rule_strengths
+        out = np.zeros((strengths.shape[0], len(self.output_sets)))
+        for c, rules in enumerate(self.rules_by_consequent):
+            if len(rules):
+                out[:, c] = strengths[:, rules].max(axis=1)
+        return out
+
+    def defuzzify(self, consequent_strengths):
+        alpha = np.asarray(consequent_strengths, dtype=float)
+        masks = (alpha > 0) @ self._mask_weights
+        # Real part accumulates the centroid numerator, imaginary part the denominator.
+        sums = np.zeros(len(alpha), dtype=complex)
+        for c, (knots, table) in enumerate(self._solo):
+            sums += np.interp(2 * masks + alpha[:, c], knots, table)
+        rows = np.flatnonzero(self._has_shared[masks])
+        if len(rows):
+            row_masks, row_alpha = masks[rows], alpha[rows]
+            aggregated = np.minimum(self._shared_mf[0][row_masks], row_alpha[:, 0, None])
+            for c in range(1, alpha.shape[1]):
+                np.maximum(aggregated, np.minimum(self._shared_mf[c][row_masks], row_alpha[:, c, None]), out=aggregated)
+            sums[rows] += np.einsum("ij,ij->i", aggregated, self._shared_x[row_masks]) + 1j * aggregated.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(sums.imag > 0, sums.real / sums.imag, np.nan)
+
+    def _reference_defuzzify(self, consequent_strengths):
+        # The plain discretised centroid that defuzzify() must reproduce:
+        # clip each consequent at its alpha on the fired mask's grid,
+        # aggregate by max and take the weighted mean.  Slow; see
+        # check_defuzzify().
+        alpha = np.asarray(consequent_strengths, dtype=float)
+        masks = (alpha > 0) @ self._mask_weights
+        x = self._grid_x[masks]
+        mf = self._grid_mf[masks]
+        aggregated = np.minimum(mf[:, 0, :], alpha[:, 0, None])
+        for c in range(1, alpha.shape[1]):
+            np.maximum(aggregated, np.minimum(mf[:, c, :], alpha[:, c, None]), out=aggregated)
+        numerator = (aggregated * np.nan_to_num(x)).sum(axis=1)
+        denominator = aggregated.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(denominator > 0, numerator / denominator, np.nan)
+
+    def defuzzify_gradient(self, consequent_strengths):
+        """Centroids (N,) and their derivatives (N, n_out) with respect to each alpha.
+
+        Uses right derivatives in alpha (left ones at alpha = 1), like
+        PiecewiseLinearSets.slope() in x, and holds the set of fired
+        consequents (and so the discretisation grid) fixed.
+        """
+        alpha = np.asarray(consequent_strengths, dtype=float)
+        masks = (alpha > 0) @ self._mask_weights
+        sums = np.zeros(len(alpha), dtype=complex)
+        dsums = np.zeros(alpha.shape, dtype=complex)
+        for c, (knots, table) in enumerate(self._solo):
+            shifted = 2 * masks + alpha[:, c]
+            sums += np.interp(shifted, knots, table)
+            # The segment starting at alpha, except at alpha = 1 where the
+            # mask's table ends and the last segment is used instead.
+            segment = np.minimum(
+                np.searchsorted(knots, shifted, side="right"), np.searchsorted(knots, 2 * masks + 1, side="left")
+            ) - 1
+            dsums[:, c] = (table[segment + 1] - table[segment]) / (knots[segment + 1] - knots[segment])
+        rows = np.flatnonzero(self._has_shared[masks])
+        if len(rows):
+            row_masks, row_alpha = masks[rows], alpha[rows]
+            mf = np.stack([self._shared_mf[c][row_masks] for c in range(alpha.shape[1])], axis=1)
+            clipped = np.minimum(mf, row_alpha[:, :, None])
+            aggregated = clipped.max(axis=1)
+            x = self._shared_x[row_masks]
+            sums[rows] += np.einsum("ij,ij->i", aggregated, x) + 1j * aggregated.sum(axis=1)
+            # A point rises with alpha_c where c attains the maximum and is
+            # clipped there (mf above alpha; a point exactly at alpha stays
+            # put as alpha rises).  When several clipped consequents tie, the
+            # point goes to the first of them only: their alphas usually move
+            # together through the same antecedent, and counting it for each
+            # would double it.
+            rising = (clipped == aggregated[:, None, :]) & (mf > row_alpha[:, :, None])
+            moving = rising.any(axis=1)
+            owner = rising.argmax(axis=1)
+            for c in range(alpha.shape[1]):
+                hit = moving & (owner == c)
+                dsums[rows, c] += np.einsum("ij,ij->i", hit, x) + 1j * hit.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            centroid = np.where(sums.imag > 0, sums.real / sums.imag, np.nan)
+            gradient = (dsums.real - centroid[:, None] * dsums.imag) / sums.imag[:, None]
+        return centroid, gradient
+
+    def evaluate_batch(self, X):
+        return self.defuzzify(self.consequent_strengths(X))
+
+    def evaluate(self, *values):
+        return float(self.evaluate_batch(np.array(values, dtype=float))[0])
+
+    def evaluate_interval(self, lows, highs):
+        # As in case2.py: score all lower endpoints, then all upper ones.
+        lows, highs = self.as_batch(lows), self.as_batch(highs)
+        out = self.evaluate_batch(np.concatenate([lows, highs]))
+        return out[:len(lows)], out[len(lows):]
+
+    # ------------------ Bands ------------------
+
+    def band_index(self, scores):
+        # -1 for scores below the first band and for NaN (no rule fired).
+        scores = np.asarray(scores, dtype=float)
+        index = np.searchsorted(self.band_lowers, scores, side="right") - 1
+        return np.where(np.isnan(scores), -1, index)
+
+    def band_name(self, index):
+        return self.band_names[index] if index >= 0 else None
+
+    def band(self, score):
+        if not self.band_names:
+            return None
+        return self.band_name(int(self.band_index(score)))
+
+
+def check_defuzzify(engine, n_points=200_000, seed=0, tol=1e-9):
+    """Largest difference between defuzzify() and the plain clip-and-sum centroid.
+
+    Covers random alphas on every fired-consequent mask (including ties
+    and the MF knot values, where the interpolation tables have their
+    breakpoints) and the alphas of random patients.  Raises if the two
+    disagree by more than ``tol``.
+    """
+    rng = np.random.default_rng(seed)
+    n_out = len(engine.output_sets)
+    alpha = rng.uniform(0.0, 1.0, size=(n_points, n_out)) * (rng.random((n_points, n_out)) < 0.6)
+    knots = np.unique(engine._grid_mf)
+    alpha[::7] = rng.choice(knots, size=alpha[::7].shape) * (alpha[::7] > 0)
+    alpha[::11, :] = alpha[::11, :1]
+    X = rng.uniform(engine.domains[:, 0], engine.domains[:, 1], size=(n_points, len(engine.input_names)))
+    alpha = np.concatenate([alpha, engine.consequent_strengths(X)])
+
+    fast, reference = engine.defuzzify(alpha), engine._reference_defuzzify(alpha)
+    if not np.array_equal(np.isnan(fast), np.isnan(reference)):
+        raise AssertionError("defuzzify() and the reference centroid disagree on where no rule fires")
+    diff = float(np.nanmax(np.abs(fast - reference), initial=0.0))
+    if diff > tol:
+        raise AssertionError(f"defuzzify() differs from the reference centroid by {diff:.3g}")
+    return diff
+
+
+def main():
+    engine = Engine.from_file()
+    try:
+        age_val = float(input("Enter patient age (0–130): "))
+        headache_val = float(input("Enter headache severity (0–10): "))
+        temp_val = float(input("Enter temperature (30–45 °C): "))
+
+        urgency_value = engine.evaluate(age_val, headache_val, temp_val)
+        print(f"\nFinal Defuzzified Urgency = {urgency_value:.2f} ({engine.band(urgency_value)}, model {engine.version})")
+
+    except ValueError as e:
+        print(f"Invalid input: {e}")
+
+
+if __name__ == "__main__":
+    main()
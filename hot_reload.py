@@ -0,0 +1,163 @@
+import logging
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from fls_engine import DEFAULT_DEFINITION, Engine, load_definition
+
+# Long-running scorer that watches the rulebase definition and swaps in a
+# new engine without a restart.  A replacement engine is parsed, validated,
+# compiled and warmed up on the watcher thread; only then is the engine
+# reference replaced, which is a single atomic assignment.  Each request
+# reads that reference exactly once, so requests already in flight finish
+# on the engine (and version) they started with.
+
+logger = logging.getLogger(__name__)
+
+ScoredResult = namedtuple("ScoredResult", ["urgency", "band", "version"])
+
+
+def _warm_up(engine):
+    # Run every code path once (scalar and batch, including the domain
+    # corners) so the first real request after a swap pays no first-call cost.
+    corners = np.array(np.meshgrid(*engine.domains)).reshape(len(engine.input_names), -1).T
+    scores = engine.evaluate_batch(corners)
+    if np.isnan(scores).any():
+        raise ValueError("No rule fires at some corner of the input domain")
+    engine.band(float(scores[0]))
+    engine.evaluate(*engine.domains.mean(axis=1))
+
+
+class HotReloadScorer:
+
+    def __init__(self, path=DEFAULT_DEFINITION, poll_interval=1.0, on_swap=None):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.on_swap = on_swap
+        self.last_error = None
+        self._stamp = self._file_stamp()
+        self._engine = self._build(load_definition(path))
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def engine(self):
+        return self._engine
+
+    @property
+    def version(self):
+        return self._engine.version
+
+    # ------------------ Scoring ------------------
+
+    def score(self, *values):
+        engine = self._engine
+        urgency = engine.evaluate(*values)
+        return ScoredResult(urgency, engine.band(urgency), engine.version)
+
+    def score_batch(self, X):
+        engine = self._engine
+        urgency = engine.evaluate_batch(X)
+        bands = [engine.band_name(i) for i in engine.band_index(urgency).tolist()] if engine.band_names else None
+        return ScoredResult(urgency, bands, engine.version)
+
+    # ------------------ Reloading ------------------
+
+    def _file_stamp(self):
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def _build(self, definition):
+        engine = Engine(definition)
+        _warm_up(engine)
+        return engine
+
+    def reload(self):
+        """Rebuild from the definition file; returns True if the engine was swapped.
+
+        An invalid definition leaves the current engine in place and is
+        recorded in ``last_error``.
+        """
+        with self._reload_lock:
+            try:
+                self._stamp = self._file_stamp()
+                definition = load_definition(self.path)
+                if definition["_version"] == self._engine.version:
+                    return False
+                engine = self._build(definition)
+            except (OSError, ValueError) as e:
+                self.last_error = e
+                logger.warning("Keeping model %s, reload of %s failed: %s", self.version, self.path, e)
+                return False
+
+            old, self._engine = self._engine, engine
+            self.last_error = None
+            logger.info("Swapped model %s -> %s", old.version, engine.version)
+        if self.on_swap is not None:
+            try:
+                self.on_swap(old, engine)
+            except Exception:
+                logger.exception("on_swap callback failed for model %s", engine.version)
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                changed = self._file_stamp() != self._stamp
+            except OSError:
+                # Editors often replace the file; try again on the next tick.
+                continue
+            if not changed:
+                continue
+            # The watcher must outlive any one bad edit, or every later
+            # edit would be silently ignored.
+            try:
+                self.reload()
+            except Exception as e:
+                self.last_error = e
+                logger.exception("Keeping model %s, reload of %s failed", self.version, self.path)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="rulebase-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    with HotReloadScorer(poll_interval=0.5) as scorer:
+        print(f"Serving model {scorer.version}; edit {scorer.path} to reload it.")
+        try:
+            while True:
+                age_val = float(input("Enter patient age (0–130): "))
+                headache_val = float(input("Enter headache severity (0–10): "))
+                temp_val = float(input("Enter temperature (30–45 °C): "))
+
+                result = scorer.score(age_val, headache_val, temp_val)
+                print(f"\nUrgency = {result.urgency:.2f} ({result.band}, model {result.version})\n")
+
+        except ValueError as e:
+            print(f"Invalid input: {e}")
+        except (EOFError, KeyboardInterrupt):
+            pass
+
+
+if __name__ == "__main__":
+    main()
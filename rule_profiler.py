@@ -0,0 +1,252 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from fls_engine import WILDCARD, Engine
+
+# Rule coverage profiling and pruning.
+#
+# RuleProfiler sits in front of an engine and, while scoring, accumulates
+# per-rule firing counts and a fixed-width histogram of firing strengths.
+# Memory is O(rules x bins) no matter how much traffic is seen.  From those
+# statistics prune() derives a smaller engine:
+#
+#   1. rules that never fired on the profiled traffic are dropped, which
+#      changes no profiled output since a rule at strength 0 contributes
+#      nothing to the aggregated set -- unless dropping them would leave
+#      part of the input domain where no rule fires at all (see
+#      coverage_probes), in which case enough of them are kept;
+#   2. rules with the same consequent whose antecedents differ on a single
+#      input are merged into one rule with a disjunction on that input,
+#      which is exact everywhere because min distributes over max;
+#   3. optionally, the rarest remaining rules are dropped one at a time for
+#      as long as the output on a replay sample stays within max_deviation.
+
+PruneReport = namedtuple(
+    "PruneReport", ["rules_before", "never_fired", "kept_for_coverage", "merged", "dropped", "max_deviation"]
+)
+
+
+def coverage_probes(engine):
+    """One point in every region of the input box where the same sets are non-zero.
+
+    Memberships only become zero or non-zero at support endpoints, so the
+    endpoints themselves and the midpoints between them see every
+    combination of active sets; a rulebase fires everywhere in the domain
+    iff it fires at all of these points.
+    """
+    axes = []
+    for i, sets in enumerate(engine.input_sets):
+        low, high = engine.domains[i]
+        points = np.unique(np.clip(np.concatenate([[low, high], sets.a, sets.d]), low, high))
+        axes.append(np.concatenate([points, (points[:-1] + points[1:]) / 2]))
+    return np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, len(axes))
+
+
+class RuleProfiler:
+
+    def __init__(self, engine=None, bins=10):
+        self.engine = engine if engine is not None else Engine.from_file()
+        self.bins = bins
+        n_rules = len(self.engine.rules)
+        self.observed = 0
+        self.fire_counts = np.zeros(n_rules, dtype=np.int64)
+        self.strength_sums = np.zeros(n_rules)
+        self.histograms = np.zeros((n_rules, bins), dtype=np.int64)
+
+    def reset(self):
+        self.observed = 0
+        self.fire_counts[:] = 0
+        self.strength_sums[:] = 0
+        self.histograms[:] = 0
+
+    def observe(self, X, rule_strengths=None):
+        strengths = self.engine.rule_strengths(X) if rule_strengths is None else rule_strengths
+        fired = strengths > 0
+        self.observed += len(strengths)
+        self.fire_counts += fired.sum(axis=0)
+        self.strength_sums += strengths.sum(axis=0)
+        # Fired strengths fall in (0, 1]; bin b covers (b / bins, (b + 1) / bins].
+        rule_index = np.nonzero(fired)[1]
+        bin_index = np.ceil(strengths[fired] * self.bins).astype(np.intp) - 1
+        self.histograms += np.bincount(
+            rule_index * self.bins + bin_index, minlength=self.histograms.size
+        ).reshape(self.histograms.shape)
+        return strengths
+
+    def evaluate_batch(self, X):
+        """Score ``X`` like ``engine.evaluate_batch`` while profiling it."""
+        strengths = self.observe(X)
+        return self.engine.defuzzify(self.engine.consequent_strengths(X, strengths))
+
+    # ------------------ Reporting ------------------
+
+    def describe_rule(self, r):
+        rule = self.engine.rules[r]
+        parts = []
+        for name in self.engine.input_names:
+            sets = rule["if"][name]
+            parts.append(sets if isinstance(sets, str) else "(" + " ∨ ".join(sets) + ")")
+        return " ∧ ".join(parts) + " → " + rule["then"]
+
+    def report(self):
+        lines = [f"Rule coverage over {self.observed} evaluations of model {self.engine.version}"]
+        lines.append(f"{'rule':>4}  {'fired':>7}  {'mean α':>6}  histogram (0→1)")
+        shades = " ▁▂▃▄▅▆▇█"
+        for r in np.argsort(self.fire_counts, kind="stable"):
+            fired = self.fire_counts[r]
+            share = fired / self.observed if self.observed else 0.0
+            mean = self.strength_sums[r] / fired if fired else 0.0
+            peak = self.histograms[r].max()
+            bars = "".join(shades[int(np.ceil(8 * h / peak))] if peak else " " for h in self.histograms[r])
+            lines.append(f"{r:>4}  {100 * share:6.2f}%  {mean:6.3f}  |{bars}|  {self.describe_rule(r)}")
+        return "\n".join(lines)
+
+    # ------------------ Pruning ------------------
+
+    def prune(self, X=None, max_deviation=0.0):
+        """Build a pruned engine; returns (engine, PruneReport).
+
+        With ``X`` (ideally the profiled traffic, or a sample of it) and a
+        positive ``max_deviation``, rare rules are also dropped as long as
+        no output on ``X`` moves by more than ``max_deviation``; the
+        deviation actually reached on ``X`` is reported.  No rule is ever
+        dropped if that would leave a part of the domain covered by the
+        original rulebase with no firing rule.
+        """
+        engine = self.engine
+        if max_deviation > 0 and X is None:
+            raise ValueError("Dropping rules within max_deviation needs replay data X")
+        probes = coverage_probes(engine)
+        probe_fires = engine.rule_strengths(probes) > 0
+        required = probe_fires.any(axis=1)
+
+        # Never-fired rules go, except any still needed so that no part of
+        # the domain the full rulebase covers is left without a firing rule.
+        keep = self.fire_counts > 0
+        never_fired = int((~keep).sum())
+        covered = probe_fires[:, keep].any(axis=1)
+        kept_for_coverage = 0
+        for r in np.flatnonzero(~keep):
+            if (probe_fires[:, r] & required & ~covered).any():
+                keep[r] = True
+                covered |= probe_fires[:, r]
+                kept_for_coverage += 1
+        kept = [engine.rules[r] for r in np.flatnonzero(keep)]
+        if not kept:
+            raise ValueError("No rule fired on the profiled data; nothing to keep")
+
+        merged_rules = _merge_rules(engine, kept)
+        merged = len(kept) - len(merged_rules)
+        pruned = engine.with_rules(merged_rules, "pruned")
+
+        dropped = 0
+        deviation = 0.0
+        if X is not None:
+            reference = engine.evaluate_batch(X)
+            deviation = _max_deviation(reference, pruned.evaluate_batch(X))
+            if max_deviation > 0:
+                # Try the rarest rules first: least total firing strength.
+                profile = RuleProfiler(pruned, bins=1)
+                profile.observe(X)
+                for r in np.argsort(profile.strength_sums, kind="stable"):
+                    rule = profile.engine.rules[r]
+                    rules = [other for other in pruned.rules if other is not rule]
+                    if not rules:
+                        break
+                    candidate = pruned.with_rules(rules, "pruned")
+                    if np.isnan(candidate.evaluate_batch(probes[required])).any():
+                        continue
+                    candidate_deviation = _max_deviation(reference, candidate.evaluate_batch(X))
+                    if candidate_deviation <= max_deviation:
+                        pruned, deviation = candidate, candidate_deviation
+                        dropped += 1
+
+        report = PruneReport(len(engine.rules), never_fired, kept_for_coverage, merged, dropped, deviation)
+        return pruned, report
+
+
+def _max_deviation(reference, scores):
+    # A row with no firing rule (NaN) counts as an unbounded deviation.
+    diff = np.abs(reference - scores)
+    return float(np.inf) if np.isnan(diff).any() else float(diff.max(initial=0.0))
+
+
+def _set_list(sets):
+    return [sets] if isinstance(sets, str) else list(sets)
+
+
+def _merge_rules(engine, rules):
+    # Repeatedly merge pairs of rules that share a consequent and agree on
+    # every input but one; the merged rule ORs the sets on that input.
+    order = {name: j for sets in engine.input_sets for j, name in enumerate(sets.names)}
+    all_sets = {name: list(sets.names) for name, sets in zip(engine.input_names, engine.input_sets)}
+    rules = [
+        {"if": {k: all_sets[k] if v == WILDCARD else _set_list(v) for k, v in rule["if"].items()}, "then": rule["then"]}
+        for rule in rules
+    ]
+    changed = True
+    while changed:
+        changed = False
+        for name in engine.input_names:
+            groups = {}
+            for rule in rules:
+                key = (rule["then"],) + tuple(
+                    tuple(rule["if"][other]) for other in engine.input_names if other != name
+                )
+                groups.setdefault(key, []).append(rule)
+            if all(len(group) == 1 for group in groups.values()):
+                continue
+            rules = []
+            for group in groups.values():
+                if len(group) > 1:
+                    changed = True
+                sets = sorted({s for rule in group for s in rule["if"][name]}, key=order.get)
+                merged = {"if": dict(group[0]["if"]), "then": group[0]["then"]}
+                merged["if"][name] = sets
+                rules.append(merged)
+    for rule in rules:
+        for name, sets in rule["if"].items():
+            if len(sets) == 1:
+                rule["if"][name] = sets[0]
+    return rules
+
+
+def main(n_patients=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    engine = Engine.from_file()
+    # Rough stand-in for an emergency-department mix: adults, mostly
+    # mild-to-moderate headaches, temperatures clustered near normal.
+    X = np.column_stack([
+        np.clip(rng.normal(45, 18, n_patients), 16, 100),
+        np.clip(rng.gamma(2.0, 1.5, n_patients), 0, 10),
+        np.clip(rng.normal(37.2, 0.9, n_patients), 30, 45),
+    ])
+
+    profiler = RuleProfiler(engine)
+    t0 = time.perf_counter()
+    for start in range(0, n_patients, 10_000):
+        profiler.evaluate_batch(X[start:start + 10_000])
+    t_profiled = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for start in range(0, n_patients, 10_000):
+        engine.evaluate_batch(X[start:start + 10_000])
+    t_plain = time.perf_counter() - t0
+
+    print(profiler.report())
+    print(f"\nProfiling overhead: {1e3 * t_plain:.0f} ms plain vs {1e3 * t_profiled:.0f} ms profiled")
+
+    for bound in (0.0, 0.5):
+        pruned, report = profiler.prune(X[:20_000], max_deviation=bound)
+        t0 = time.perf_counter()
+        pruned.evaluate_batch(X)
+        t_pruned = time.perf_counter() - t0
+        print(f"\nmax_deviation={bound}: {report.rules_before} rules -> {len(pruned.rules)} "
+              f"({report.never_fired} never fired, {report.kept_for_coverage} of them kept for coverage, "
+              f"{report.merged} merged away, {report.dropped} dropped), "
+              f"deviation on replay {report.max_deviation:.4f}, scoring {1e3 * t_pruned:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import itertools
+import time
+
+import numpy as np
+
+from fls_engine import WILDCARD, Engine, stamp_version
+
+# Table-driven evaluation for large, grid-shaped rulebases.
+#
+# With one rule per combination of input sets, the number of rules is the
+# product of the set counts, and evaluating every rule for every patient
+# (as Engine and juzzy's T1_Rulebase do) grows with it.  TableEngine
+# stores the rulebase as an N-dimensional table indexed by one set per
+# input, each cell holding a bitmask of the consequents of the rules that
+# cover it (0 where no rule does).  Rules with disjunctions or WILDCARD
+# antecedents fill a block of cells at once; this is exact because min
+# distributes over max, so a rule over a disjunction fires exactly as
+# strongly as the set of rules it expands into.
+#
+# At any input value only one or two overlapping sets have non-zero
+# membership, so each patient is evaluated over the product of its active
+# sets only (at most 2^N cells with pairwise overlaps, usually far fewer)
+# instead of over every rule.  Defuzzification is the engine's own.
+
+
+class TableEngine(Engine):
+
+    def __init__(self, definition):
+        super().__init__(definition)
+        n_out = len(self.output_sets)
+        dtype = next(t for t in (np.uint8, np.uint16, np.uint32, np.uint64) if np.iinfo(t).bits >= n_out)
+        self.shape = tuple(len(sets) for sets in self.input_sets)
+        self.table = np.zeros(self.shape, dtype=dtype)
+        for r, c in enumerate(self.consequents):
+            cells = np.ix_(*(list(self.terms[i][t]) for i, t in enumerate(self.antecedents[r])))
+            self.table[cells] |= dtype(1 << c)
+        self._flat_table = self.table.ravel()
+        self._strides = np.array([int(np.prod(self.shape[i + 1:])) for i in range(len(self.shape))], dtype=np.intp)
+
+    def active_cells(self, X):
+        """Table cells with non-zero firing strength, as flat (row, cell offset, strength) arrays."""
+        X = self.as_batch(X)
+        rows = np.arange(len(X))
+        offsets = np.zeros(len(X), dtype=np.intp)
+        strengths = np.ones(len(X))
+        # Extend every partial cell by each non-zero set of the next input;
+        # the sets of one patient are contiguous in np.nonzero's row-major
+        # output, starting at first[row].
+        for i, sets in enumerate(self.input_sets):
+            mu = sets.membership(X[:, i])
+            nz_rows, nz_sets = np.nonzero(mu > 0)
+            counts = np.bincount(nz_rows, minlength=len(X))
+            first = np.cumsum(counts) - counts
+            reps = counts[rows]
+            total = int(reps.sum())
+            group_start = np.repeat(np.cumsum(reps) - reps, reps)
+            pick = first[np.repeat(rows, reps)] + np.arange(total) - group_start
+            chosen = nz_sets[pick]
+            offsets = np.repeat(offsets, reps) + self._strides[i] * chosen
+            strengths = np.minimum(np.repeat(strengths, reps), mu[nz_rows[pick], chosen])
+            rows = nz_rows[pick]
+        return rows, offsets, strengths
+
+    def consequent_strengths(self, X, rule_strengths=None):
+        if rule_strengths is not None:
+            return super().consequent_strengths(X, rule_strengths)
+        X = self.as_batch(X)
+        rows, offsets, strengths = self.active_cells(X)
+        masks = self._flat_table[offsets]
+        out = np.zeros((len(X), len(self.output_sets)))
+        for c in range(len(self.output_sets)):
+            fired = (masks & masks.dtype.type(1 << c)) > 0
+            np.maximum.at(out[:, c], rows[fired], strengths[fired])
+        return out
+
+    def expanded_rules(self):
+        """The table as one plain rule per covered cell and consequent, as case1b.py builds them."""
+        rules = []
+        for cell in zip(*np.nonzero(self.table)):
+            antecedent = {name: sets.names[j] for name, sets, j in zip(self.input_names, self.input_sets, cell)}
+            for c, name in enumerate(self.output_sets.names):
+                if self.table[cell] & (1 << c):
+                    rules.append({"if": antecedent, "then": name})
+        return rules
+
+
+def grid_definition(base, extra_inputs, rules):
+    """A definition with ``base``'s output and bands, ``extra_inputs`` appended to its inputs, and ``rules``."""
+    definition = {k: v for k, v in base.items() if k not in ("_version", "rules")}
+    definition["inputs"] = list(base["inputs"]) + list(extra_inputs)
+    definition["rules"] = rules
+    definition["version"] = f"{base.get('version')}-{len(definition['inputs'])}inputs"
+    return definition
+
+
+# ------------------ Benchmark ------------------
+
+# Extra vital signs for the larger models.  Each has Low / Normal / High
+# sets; any abnormal value counts towards the urgency of the grid rules.
+VITALS = [
+    {"name": "heart_rate", "domain": [20, 220],
+     "sets": {"HeartRateLow": [20, 20, 45, 60], "HeartRateNormal": [50, 75, 100], "HeartRateHigh": [90, 130, 220, 220]}},
+    {"name": "systolic_bp", "domain": [50, 250],
+     "sets": {"SystolicLow": [50, 50, 85, 100], "SystolicNormal": [90, 120, 145], "SystolicHigh": [135, 170, 250, 250]}},
+    {"name": "spo2", "domain": [50, 100],
+     "sets": {"SpO2Low": [50, 50, 88, 92], "SpO2Normal": [90, 96, 100, 100]}},
+    {"name": "respiratory_rate", "domain": [0, 60],
+     "sets": {"RespLow": [0, 0, 8, 12], "RespNormal": [10, 15, 20], "RespHigh": [18, 26, 60, 60]}},
+]
+
+
+def vitals_rules(definition):
+    # Temperature and SpO2 overrides go straight to Emergency whatever the
+    # other inputs (as case1b.py does for temperature); every other cell
+    # of the grid is Standard, Urgent or Emergency by how many extra vital
+    # signs are abnormal, starting from case1's answer for the cell.
+    inputs = definition["inputs"]
+    names = [inp["name"] for inp in inputs]
+    case1 = Engine.from_file()
+    case1_rules = {
+        tuple(rule["if"][name] for name in case1.input_names): rule["then"] for rule in case1.rules
+    }
+    levels = list(case1.output_sets.names)
+    override = {"temperature": ["TempLow", "TempHigh"], "spo2": ["SpO2Low"]}
+
+    rules = []
+    for name, sets in override.items():
+        if name in names:
+            rule = {n: WILDCARD for n in names}
+            rule[name] = sets
+            rules.append({"if": rule, "then": "UrgencyEmergency"})
+    normal = {name: [s for s in inp["sets"] if s not in override.get(name, [])] for name, inp in zip(names, inputs)}
+    for combo in itertools.product(*(normal[name] for name in names)):
+        cell = dict(zip(names, combo))
+        level = levels.index(case1_rules[tuple(cell[name] for name in case1.input_names)])
+        level += sum(1 for name in names[3:] if not cell[name].endswith("Normal"))
+        rules.append({"if": cell, "then": levels[min(level, len(levels) - 1)]})
+    return rules
+
+
+def main(n_patients=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    base = Engine.from_file().definition
+    for n_extra in (0, 2, 4):
+        definition = grid_definition(base, VITALS[:n_extra], [])
+        definition["rules"] = vitals_rules(definition)
+        stamp_version(definition)
+
+        t0 = time.perf_counter()
+        table = TableEngine(definition)
+        t_build = time.perf_counter() - t0
+        expanded = dict(definition, rules=table.expanded_rules())
+        t0 = time.perf_counter()
+        engine = Engine(stamp_version(expanded))
+        t_build_rules = time.perf_counter() - t0
+
+        X = rng.uniform(table.domains[:, 0], table.domains[:, 1], size=(n_patients, len(table.input_names)))
+        rows, _, _ = table.active_cells(X)
+        t0 = time.perf_counter()
+        fast = table.evaluate_batch(X)
+        t_table = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        reference = engine.evaluate_batch(X)
+        t_rules = time.perf_counter() - t0
+        same_nan = np.array_equal(np.isnan(fast), np.isnan(reference))
+        drift = np.nanmax(np.abs(fast - reference)) if same_nan else np.inf
+        print(f"{len(table.input_names)} inputs: {len(definition['rules'])} declared rules, "
+              f"{len(engine.rules)} once expanded; build {1e3 * t_build:.1f} ms (table) vs "
+              f"{1e3 * t_build_rules:.1f} ms (rules)")
+        print(f"    {n_patients} patients, {len(rows) / n_patients:.1f} active cells each: table {1e3 * t_table:.0f} ms, "
+              f"rule-by-rule {1e3 * t_rules:.0f} ms ({t_rules / t_table:.1f}x), max difference {drift:.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from fls_engine import Engine
+
+# Input sensitivities of the case1 urgency.
+#
+# Every MF is piecewise linear and inference is min/max, so away from kinks
+# the urgency depends on each input through exactly one path: the input
+# that is the minimum of the strongest rule of some consequent, which
+# raises or lowers that consequent's clipping level alpha, which moves the
+# centroid.  gradient() follows those paths for a whole batch at once:
+#
+#   dy/dx_i = sum_c dy/dalpha_c * dalpha_c/dx_i
+#   dy/dalpha_c = sum_k (x_k - y) [c clips grid point k at alpha_c] / sum_k agg_k
+#
+# where the second factor comes from Engine.defuzzify_gradient.
+#
+# Derivatives are right derivatives, both at MF kinks in x and at the
+# clipping knots in alpha, and ignore the jumps that happen when a
+# consequent starts or stops firing (its support then changes the
+# discretisation grid).  band_flips() answers "how far must one
+# input move to change the band" by scanning each input axis in one batch
+# and bisecting the first band change on either side.
+
+Sensitivity = namedtuple("Sensitivity", ["urgency", "gradient", "band", "flip_delta", "flip_band"])
+
+
+def _term_values_and_slopes(engine, i, mu, slope):
+    # Memberships of input i's terms with the slope of the set that
+    # realises each term (the largest set of a disjunction).
+    values, slopes = [mu], [slope]
+    for term in engine.terms[i][len(engine.input_sets[i]):]:
+        pick = np.array(term)[mu[:, list(term)].argmax(axis=1)]
+        rows = np.arange(len(mu))
+        values.append(mu[rows, pick][:, None])
+        slopes.append(slope[rows, pick][:, None])
+    return np.concatenate(values, axis=1), np.concatenate(slopes, axis=1)
+
+
+def gradient(engine, X):
+    """Urgency and its partial derivatives with respect to each input; shapes (N,) and (N, n_inputs)."""
+    X = engine.as_batch(X)
+    n, n_inputs = X.shape
+    n_out = len(engine.output_sets)
+    rows = np.arange(n)
+
+    # dalpha_c / dx_i through the strongest rule of c and its weakest antecedent.
+    strengths = strength_slopes = weakest = None
+    for i, sets in enumerate(engine.input_sets):
+        mu, slope = _term_values_and_slopes(engine, i, sets.membership(X[:, i]), sets.slope(X[:, i]))
+        mu, slope = mu[:, engine.antecedents[:, i]], slope[:, engine.antecedents[:, i]]
+        if strengths is None:
+            strengths, strength_slopes, weakest = mu, slope, np.zeros(mu.shape, dtype=np.intp)
+            continue
+        lower = mu < strengths
+        strengths = np.where(lower, mu, strengths)
+        strength_slopes = np.where(lower, slope, strength_slopes)
+        weakest[lower] = i
+
+    alpha = np.zeros((n, n_out))
+    dalpha_dx = np.zeros((n, n_out, n_inputs))
+    for c, rules in enumerate(engine.rules_by_consequent):
+        if not len(rules):
+            continue
+        best = rules[strengths[:, rules].argmax(axis=1)]
+        alpha[:, c] = strengths[rows, best]
+        dalpha_dx[rows, c, weakest[rows, best]] = np.where(alpha[:, c] > 0, strength_slopes[rows, best], 0.0)
+
+    urgency, dy_dalpha = engine.defuzzify_gradient(alpha)
+    return urgency, np.einsum("nc,nci->ni", np.nan_to_num(dy_dalpha), dalpha_dx)
+
+
+def band_flips(engine, X, scan_points=257, tol=1e-6, chunk_rows=65536):
+    """Smallest signed change of each single input that changes the band.
+
+    Returns (delta, new_band), both (N, n_inputs); delta is NaN and
+    new_band -1 where no value of that input within its domain changes the
+    band.  Band changes narrower than the scan step may be missed.
+    """
+    X = engine.as_batch(X)
+    n, n_inputs = X.shape
+    current = engine.band_index(engine.evaluate_batch(X))
+    delta = np.full((n, n_inputs), np.nan)
+    new_band = np.full((n, n_inputs), -1, dtype=np.intp)
+
+    def bands_at(points):
+        out = np.empty(len(points), dtype=np.intp)
+        for start in range(0, len(points), chunk_rows):
+            out[start:start + chunk_rows] = engine.band_index(engine.evaluate_batch(points[start:start + chunk_rows]))
+        return out
+
+    for i in range(n_inputs):
+        low, high = engine.domains[i]
+        grid = np.linspace(low, high, scan_points)
+        points = np.repeat(X, scan_points, axis=0)
+        points[:, i] = np.tile(grid, n)
+        changed = bands_at(points).reshape(n, scan_points) != current[:, None]
+
+        best = np.full(n, np.inf)
+        for direction in (1, -1):
+            # First scanned value past x_i (in this direction) with a new band.
+            ahead = (grid[None, :] - X[:, i, None]) * direction > 0
+            candidate = changed & ahead
+            has = candidate.any(axis=1)
+            if direction == 1:
+                first = np.where(has, candidate.argmax(axis=1), 0)
+            else:
+                first = np.where(has, scan_points - 1 - candidate[:, ::-1].argmax(axis=1), 0)
+            # Bisect between the last unchanged point and the first changed one.
+            near = np.where(has, X[:, i], np.nan)
+            far = np.where(has, grid[first], np.nan)
+            previous = first - direction
+            inside = has & (previous >= 0) & (previous < scan_points)
+            step_back = grid[np.clip(previous, 0, scan_points - 1)]
+            keep = inside & ((step_back - X[:, i]) * direction > 0)
+            near[keep] = step_back[keep]
+            todo = np.flatnonzero(has)
+            while len(todo):
+                probe = X[todo].copy()
+                mid = (near[todo] + far[todo]) / 2
+                probe[:, i] = mid
+                flipped = bands_at(probe) != current[todo]
+                far[todo[flipped]] = mid[flipped]
+                near[todo[~flipped]] = mid[~flipped]
+                todo = todo[np.abs(far[todo] - near[todo]) > tol]
+            moved = far - X[:, i]
+            closer = has & (np.abs(moved) < best)
+            best[closer] = np.abs(moved[closer])
+            delta[closer, i] = moved[closer]
+        if np.isfinite(best).any():
+            found = np.isfinite(best)
+            probe = X[found].copy()
+            probe[:, i] += delta[found, i]
+            new_band[found, i] = bands_at(probe)
+    return delta, new_band
+
+
+def sensitivities(engine, X, **flip_options):
+    urgency, grad = gradient(engine, X)
+    delta, new_band = band_flips(engine, X, **flip_options)
+    return Sensitivity(urgency, grad, engine.band_index(urgency), delta, new_band)
+
+
+def finite_difference_gradient(engine, X, h=1e-4):
+    X = engine.as_batch(X)
+    grad = np.empty_like(X)
+    for i in range(X.shape[1]):
+        step = np.zeros(X.shape[1])
+        step[i] = h
+        up = np.minimum(X + step, engine.domains[:, 1])
+        down = np.maximum(X - step, engine.domains[:, 0])
+        grad[:, i] = (engine.evaluate_batch(up) - engine.evaluate_batch(down)) / (up[:, i] - down[:, i])
+    return grad
+
+
+def main(n_patients=10_000, seed=0):
+    rng = np.random.default_rng(seed)
+    engine = Engine.from_file()
+
+    patient = [[45, 6, 38.0]]
+    s = sensitivities(engine, patient)
+    print(f"Patient (45, 6, 38.0 °C): urgency {s.urgency[0]:.2f} ({engine.band_name(s.band[0])})")
+    for i, name in enumerate(engine.input_names):
+        flip = (f"{s.flip_delta[0, i]:+.3f} -> {engine.band_name(s.flip_band[0, i])}"
+                if s.flip_band[0, i] >= 0 else "no band change in domain")
+        print(f"  d urgency / d {name} = {s.gradient[0, i]:+.3f}; {flip}")
+
+    X = rng.uniform(engine.domains[:, 0], engine.domains[:, 1], size=(n_patients, len(engine.input_names)))
+    t0 = time.perf_counter()
+    _, grad = gradient(engine, X)
+    t_analytic = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fd = finite_difference_gradient(engine, X)
+    t_fd = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for row in X[:500]:
+        for i in range(len(row)):
+            up, down = row.copy(), row.copy()
+            up[i] = min(up[i] + 1e-4, engine.domains[i, 1])
+            down[i] = max(down[i] - 1e-4, engine.domains[i, 0])
+            engine.evaluate(*up) - engine.evaluate(*down)
+    t_loop = (time.perf_counter() - t0) / 500 * n_patients
+
+    agree = np.isclose(grad, fd, rtol=1e-3, atol=1e-3).all(axis=1)
+    print(f"\nGradients for {n_patients} patients: analytic {1e3 * t_analytic:.0f} ms, "
+          f"batched finite differences {1e3 * t_fd:.0f} ms, per-patient re-evaluation ~{1e3 * t_loop:.0f} ms")
+    print(f"Analytic and finite-difference gradients agree for {100 * agree.mean():.1f}% of patients "
+          "(the rest sit within 1e-4 of a kink or a change in the fired consequents)")
+
+    t0 = time.perf_counter()
+    band_flips(engine, X[:1000])
+    print(f"band_flips for 1000 patients: {1e3 * (time.perf_counter() - t0):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+import heapq
+import itertools
+import time
+
+import numpy as np
+
+from fls_engine import Engine
+
+# Waiting-room ordering by case1 urgency.
+#
+# An indexed binary heap keyed by patient ID: the heap holds IDs, and
+# ``_pos`` maps each ID to its slot so that changing one patient's inputs
+# re-scores only that patient and sifts it to its new place in O(log n)
+# instead of re-scoring and re-sorting the whole room.  Ties on urgency are
+# broken by arrival order.
+
+
+class TriageQueue:
+
+    def __init__(self, engine=None, emergency_threshold=None, on_emergency=None):
+        self.engine = engine if engine is not None else Engine.from_file()
+        if emergency_threshold is None:
+            emergency_threshold = self._band_lower("Emergency")
+        self.emergency_threshold = emergency_threshold
+        # on_emergency(patient_id, old_score, new_score) is called whenever a
+        # patient's score moves from below the threshold (or from nothing, on
+        # insert) to at or above it.
+        self.on_emergency = on_emergency
+        self._heap = []
+        self._pos = {}
+        self._key = {}
+        self._inputs = {}
+        self._arrival = itertools.count()
+
+    def _band_lower(self, name):
+        if name not in self.engine.band_names:
+            raise ValueError(f"Model has no '{name}' band; pass emergency_threshold explicitly")
+        return float(self.engine.band_lowers[self.engine.band_names.index(name)])
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, patient_id):
+        return patient_id in self._pos
+
+    def score(self, patient_id):
+        return -self._key[patient_id][0]
+
+    def inputs(self, patient_id):
+        return dict(zip(self.engine.input_names, self._inputs[patient_id]))
+
+    # ------------------ Heap internals ------------------
+
+    def _less(self, i, j):
+        return self._key[self._heap[i]] < self._key[self._heap[j]]
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._pos[heap[i]] = i
+        self._pos[heap[j]] = j
+
+    def _sift_up(self, i):
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not self._less(i, parent):
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i):
+        n = len(self._heap)
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and self._less(child + 1, child):
+                child += 1
+            if not self._less(child, i):
+                break
+            self._swap(i, child)
+            i = child
+
+    def _notify(self, patient_id, old, new):
+        if self.on_emergency is None:
+            return
+        if new >= self.emergency_threshold and (old is None or old < self.emergency_threshold):
+            self.on_emergency(patient_id, old, new)
+
+    def _check_scores(self, patient_ids, scores):
+        # A NaN key compares False both ways and would wedge the heap, so
+        # an unscorable patient (no rule fires) is refused up front.
+        bad = ~np.isfinite(scores)
+        if bad.any():
+            patient_id = patient_ids[int(np.flatnonzero(bad)[0])]
+            raise ValueError(f"Model {self.engine.version} gives no urgency for patient {patient_id!r} (no rule fires)")
+
+    # ------------------ Public operations ------------------
+
+    def push(self, patient_id, *values):
+        if patient_id in self._pos:
+            raise KeyError(f"Patient {patient_id!r} is already queued")
+        inputs = np.array(values, dtype=float)
+        urgency = self.engine.evaluate(*inputs)
+        self._check_scores([patient_id], np.array([urgency]))
+        self._inputs[patient_id] = inputs
+        self._key[patient_id] = (-urgency, next(self._arrival))
+        self._pos[patient_id] = len(self._heap)
+        self._heap.append(patient_id)
+        self._sift_up(len(self._heap) - 1)
+        self._notify(patient_id, None, urgency)
+        return urgency
+
+    def push_many(self, patient_ids, X):
+        # One vectorised scoring pass and an O(n) heapify when the room is
+        # loaded from scratch, otherwise one sift per patient.
+        patient_ids = list(patient_ids)
+        # A copy, so later changes to the caller's array cannot desync
+        # stored inputs from their queued urgency.
+        X = np.array(X, dtype=float)
+        if X.ndim != 2 or len(X) != len(patient_ids):
+            raise ValueError(f"Expected one row of inputs per patient ({len(patient_ids)}), got shape {X.shape}")
+        if len(set(patient_ids)) != len(patient_ids) or any(p in self._pos for p in patient_ids):
+            raise KeyError("Patient IDs must be unique and not already queued")
+        scores = self.engine.evaluate_batch(X)
+        self._check_scores(patient_ids, scores)
+        rebuild = len(patient_ids) > len(self._heap)
+        for patient_id, inputs, urgency in zip(patient_ids, X, scores.tolist()):
+            self._inputs[patient_id] = inputs
+            self._key[patient_id] = (-urgency, next(self._arrival))
+            self._pos[patient_id] = len(self._heap)
+            self._heap.append(patient_id)
+            if not rebuild:
+                self._sift_up(len(self._heap) - 1)
+        if rebuild:
+            for i in reversed(range(len(self._heap) // 2)):
+                self._sift_down(i)
+        for patient_id, urgency in zip(patient_ids, scores.tolist()):
+            self._notify(patient_id, None, urgency)
+        return scores
+
+    def update(self, patient_id, **changes):
+        """Change some of a patient's inputs, re-score them and reposition them."""
+        inputs = self._inputs[patient_id].copy()
+        for name, value in changes.items():
+            try:
+                inputs[self.engine.input_names.index(name)] = value
+            except ValueError:
+                raise KeyError(f"Unknown input '{name}', expected one of {self.engine.input_names}")
+        urgency = self.engine.evaluate(*inputs)
+        self._check_scores([patient_id], np.array([urgency]))
+        self._inputs[patient_id] = inputs
+        self._reposition(patient_id, urgency)
+        return urgency
+
+    def _reposition(self, patient_id, urgency):
+        old_key = self._key[patient_id]
+        self._key[patient_id] = (-urgency, old_key[1])
+        i = self._pos[patient_id]
+        if self._key[patient_id] < old_key:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+        self._notify(patient_id, -old_key[0], urgency)
+
+    def update_many(self, patient_ids, **columns):
+        """Apply a burst of updates with one vectorised re-scoring pass.
+
+        ``columns`` maps input names to arrays aligned with ``patient_ids``;
+        repeated IDs are applied in order, as if ``update`` were called for each.
+        """
+        patient_ids = list(patient_ids)
+        cols = []
+        for name, values in columns.items():
+            if name not in self.engine.input_names:
+                raise KeyError(f"Unknown input '{name}', expected one of {self.engine.input_names}")
+            values = np.asarray(values, dtype=float)
+            if values.shape != (len(patient_ids),):
+                raise ValueError(f"Expected one '{name}' value per patient ({len(patient_ids)}), got shape {values.shape}")
+            cols.append((self.engine.input_names.index(name), values))
+        X = np.empty((len(patient_ids), len(self.engine.input_names)))
+        latest = {}
+        for row, patient_id in enumerate(patient_ids):
+            inputs = latest[patient_id] if patient_id in latest else self._inputs[patient_id].copy()
+            for col, values in cols:
+                inputs[col] = values[row]
+            X[row] = inputs
+            latest[patient_id] = inputs
+        scores = self.engine.evaluate_batch(X)
+        self._check_scores(patient_ids, scores)
+        for patient_id, inputs in latest.items():
+            self._inputs[patient_id] = inputs
+        for patient_id, urgency in zip(patient_ids, scores.tolist()):
+            self._reposition(patient_id, urgency)
+        return scores
+
+    def remove(self, patient_id):
+        i = self._pos.pop(patient_id)
+        last = self._heap.pop()
+        if last != patient_id:
+            self._heap[i] = last
+            self._pos[last] = i
+            self._sift_up(i)
+            self._sift_down(self._pos[last])
+        urgency = -self._key.pop(patient_id)[0]
+        inputs = self._inputs.pop(patient_id)
+        return urgency, inputs
+
+    def pop(self):
+        if not self._heap:
+            raise IndexError("pop from an empty triage queue")
+        patient_id = self._heap[0]
+        urgency, _ = self.remove(patient_id)
+        return patient_id, urgency
+
+    def peek(self, k=1):
+        """Top ``k`` patients as (patient_id, urgency), most urgent first, in O(k log k)."""
+        heap, key = self._heap, self._key
+        result = []
+        frontier = [(key[heap[0]], 0)] if heap else []
+        while frontier and len(result) < k:
+            (neg_urgency, _), i = heapq.heappop(frontier)
+            result.append((heap[i], -neg_urgency))
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (key[heap[child]], child))
+        return result
+
+
+def benchmark(n_patients=100_000, n_updates=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    engine = Engine.from_file()
+    lows, highs = engine.domains[:, 0], engine.domains[:, 1]
+    X = rng.uniform(lows, highs, size=(n_patients, len(lows)))
+
+    crossings = []
+    queue = TriageQueue(engine, on_emergency=lambda pid, old, new: crossings.append(pid))
+
+    t0 = time.perf_counter()
+    queue.push_many(range(n_patients), X)
+    t_load = time.perf_counter() - t0
+
+    temps = rng.uniform(lows[-1], highs[-1], size=n_updates)
+    ids = rng.integers(0, n_patients, size=n_updates)
+    crossings.clear()
+    t0 = time.perf_counter()
+    for patient_id, temp in zip(ids.tolist(), temps.tolist()):
+        queue.update(patient_id, **{engine.input_names[-1]: temp})
+    t_update = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for start in range(0, n_updates, 1000):
+        batch = slice(start, start + 1000)
+        queue.update_many(ids[batch].tolist(), **{engine.input_names[-1]: temps[batch]})
+    t_burst = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        queue.peek(10)
+    t_peek = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    np.argsort(-engine.evaluate_batch(X), kind="stable")
+    t_resort = time.perf_counter() - t0
+
+    print(f"Loaded {n_patients} patients in {t_load:.2f}s")
+    print(f"{n_updates} updates: {1e6 * t_update / n_updates:.1f} us/update "
+          f"({n_updates / t_update:.0f} updates/s, {len(crossings)} emergency crossings)")
+    print(f"{n_updates} updates in bursts of 1000: {1e6 * t_burst / n_updates:.1f} us/update "
+          f"({n_updates / t_burst:.0f} updates/s)")
+    print(f"peek(10): {1e6 * t_peek / 1000:.1f} us")
+    print(f"Full re-score + sort for comparison: {1e3 * t_resort:.1f} ms per ordering")
+
+
+if __name__ == "__main__":
+    benchmark()